@@ -8,9 +8,16 @@ __all__ = [
     "run",
 ]
 
+import prompt_toolkit.key_binding
+
 from pypager.pager import Pager
 
 
+def _handle_arg(event: prompt_toolkit.key_binding.KeyPressEvent) -> None:
+    " Append the typed digit to the repetition argument. "
+    event.append_to_arg_count(event.data)
+
+
 def keybinding(pager: Pager):
     import prompt_toolkit.filters
     import prompt_toolkit.key_binding
@@ -18,153 +25,157 @@ def keybinding(pager: Pager):
     import prompt_toolkit.utils
     from prompt_toolkit.application.current import get_app
 
-    for c in "01234556789":
-        def _handle_arg(event: prompt_toolkit.key_binding.KeyPressEvent) -> None:
-            event.append_to_arg_count(c)
-        pager.bind(_handle_arg, c, filter=pager.source_container.default_focus)
-
-    pager.bind(pager._quit, "q",
-               filter=pager.source_container.default_focus, eager=True)
-    pager.bind(pager._quit, "Q",
-               filter=pager.source_container.default_focus | pager.has_colon)
-    pager.bind(pager._quit, "Z", "Z",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager._print_filename, "=",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager._print_filename,
-               prompt_toolkit.keys.Keys.ControlG, filter=pager.source_container.default_focus)
-    pager.bind(pager._print_filename, "f", filter=pager.has_colon)
-    pager.bind(pager._help, "h",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager._help, "H",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager._repaint, "r",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager._repaint, "R",
-               filter=pager.source_container.default_focus)
-
-    pager.bind(pager.source_container._pagedown, " ",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._pagedown, "f",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._pagedown, "c-f",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._pagedown, "c-v",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._pageup, "b",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._pageup, "c-b",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._pageup,
-               "escape", "v", filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._halfdown, "d",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._halfdown, "c-d",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._halfup, "u",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._halfup, "c-u",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._down, "e",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._down, "j",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._down, "c-e",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._down, "c-n",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._down, "c-j",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._down, "c-m",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._down, "down",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._up, "y",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._up, "k",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._up, "c-y",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._up, "c-k",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._up, "c-p",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._up, "up",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._firstline,
-               "g", filter=pager.source_container.default_focus, eager=True)
-    pager.bind(pager.source_container._firstline, "<",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._firstline,
-               "escape", "<", filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._lastline, "G",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._lastline, ">",
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._lastline,
-               "escape", ">", filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._toggle_highlighting,
-               prompt_toolkit.keys.Keys.Escape, "u")
-
-    pager.bind(pager.source_container._mark, "m", prompt_toolkit.keys.Keys.Any,
-               filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._goto_mark, "'",
-               prompt_toolkit.keys.Keys.Any, filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._gotomark_dot, "c-x",
-               prompt_toolkit.keys.Keys.ControlX, filter=pager.source_container.default_focus)
-
-    pager.bind(pager.source_container._follow, "F",
-               filter=pager.source_container.default_focus)
-
-    pager.bind(pager.source_container._cancel_search,
-               "backspace",
-               filter=prompt_toolkit.filters.has_focus(
-                   pager.source_container.search_buffer) & pager.source_container.search_buffer_is_empty
-               )
-
-    pager.bind(pager.source_container._left, "left", filter=pager.source_container.default_focus &
-               ~pager.source_container.line_wrapping_enable)
-    pager.bind(pager.source_container._left, "escape",
-               "(", filter=pager.source_container.default_focus & ~pager.source_container.line_wrapping_enable)
-
-    pager.bind(pager.source_container._right, "right", filter=pager.source_container.default_focus &
-               ~pager.source_container.line_wrapping_enable)
-    pager.bind(pager.source_container._right, "escape", ")",
-               filter=pager.source_container.default_focus & ~pager.source_container.line_wrapping_enable)
-
-    pager.bind(pager._suspend, "c-z", filter=prompt_toolkit.filters.Condition(
-        lambda: prompt_toolkit.utils.suspend_to_background_supported()))
-
-    pager.bind(pager.source_container._next_file, "F",
-               filter=pager.source_container.default_focus, eager=True)
-    pager.bind(pager.source_container._previous_file, "B",
-               filter=pager.source_container.default_focus)
-
-    #
-    # ::: colon :::
-    #
-    pager.bind(pager._colon, ":", filter=pager.source_container.default_focus)
-    pager.bind(pager.source_container._next_file, "n", filter=pager.has_colon)
-    pager.bind(pager.source_container._previous_file,
-               "p", filter=pager.has_colon)
-    pager.bind(pager.source_container._remove_source,
-               "d", filter=pager.has_colon)
-    pager.bind(pager._cancel_colon, "backspace", filter=pager.has_colon)
-    pager.bind(pager._cancel_colon, "q", filter=pager.has_colon, eager=True)
-    pager.bind(pager._any, prompt_toolkit.keys.Keys.Any,
-               filter=pager.has_colon)
-    pager.bind(pager.source_container._wrap, "w", filter=pager.has_colon)
-
-    #
-    # examine
-    #
-    pager.bind(pager._examine, prompt_toolkit.keys.Keys.ControlX,
-               prompt_toolkit.keys.Keys.ControlV, filter=pager.source_container.default_focus)
-    pager.bind(pager._examine, "e", filter=pager.has_colon)
-    pager.bind(pager.source_container._cancel_examine, "c-c",
-               filter=prompt_toolkit.filters.has_focus("EXAMINE"))
-    pager.bind(pager.source_container._cancel_examine, "c-g",
-               filter=prompt_toolkit.filters.has_focus("EXAMINE"))
+    # Filters shared by many bindings. (Composed once.)
+    default_focus = pager.source_container.default_focus
+    focus_no_wrap = default_focus & ~pager.source_container.line_wrapping_enable
+    focus_or_colon = default_focus | pager.has_colon
+    examine_focus = prompt_toolkit.filters.has_focus("EXAMINE")
+
+    # Register everything at once. (Clears the key bindings cache only once.)
+    with pager.batch_bindings():
+        for c in "0123456789":
+            pager.bind(_handle_arg, c, filter=default_focus)
+
+        pager.bind(pager._quit, "q",
+                   filter=default_focus, eager=True)
+        pager.bind(pager._quit, "Q",
+                   filter=focus_or_colon)
+        pager.bind(pager._quit, "Z", "Z",
+                   filter=default_focus)
+        pager.bind(pager._print_filename, "=",
+                   filter=default_focus)
+        pager.bind(pager._print_filename,
+                   prompt_toolkit.keys.Keys.ControlG, filter=default_focus)
+        pager.bind(pager._print_filename, "f", filter=pager.has_colon)
+        pager.bind(pager._help, "h",
+                   filter=default_focus)
+        pager.bind(pager._help, "H",
+                   filter=default_focus)
+        pager.bind(pager._repaint, "r",
+                   filter=default_focus)
+        pager.bind(pager._repaint, "R",
+                   filter=default_focus)
+
+        pager.bind(pager.source_container._pagedown, " ",
+                   filter=default_focus)
+        pager.bind(pager.source_container._pagedown, "f",
+                   filter=default_focus)
+        pager.bind(pager.source_container._pagedown, "c-f",
+                   filter=default_focus)
+        pager.bind(pager.source_container._pagedown, "c-v",
+                   filter=default_focus)
+        pager.bind(pager.source_container._pageup, "b",
+                   filter=default_focus)
+        pager.bind(pager.source_container._pageup, "c-b",
+                   filter=default_focus)
+        pager.bind(pager.source_container._pageup,
+                   "escape", "v", filter=default_focus)
+        pager.bind(pager.source_container._halfdown, "d",
+                   filter=default_focus)
+        pager.bind(pager.source_container._halfdown, "c-d",
+                   filter=default_focus)
+        pager.bind(pager.source_container._halfup, "u",
+                   filter=default_focus)
+        pager.bind(pager.source_container._halfup, "c-u",
+                   filter=default_focus)
+        pager.bind(pager.source_container._down, "e",
+                   filter=default_focus)
+        pager.bind(pager.source_container._down, "j",
+                   filter=default_focus)
+        pager.bind(pager.source_container._down, "c-e",
+                   filter=default_focus)
+        pager.bind(pager.source_container._down, "c-n",
+                   filter=default_focus)
+        pager.bind(pager.source_container._down, "c-j",
+                   filter=default_focus)
+        pager.bind(pager.source_container._down, "c-m",
+                   filter=default_focus)
+        pager.bind(pager.source_container._down, "down",
+                   filter=default_focus)
+        pager.bind(pager.source_container._up, "y",
+                   filter=default_focus)
+        pager.bind(pager.source_container._up, "k",
+                   filter=default_focus)
+        pager.bind(pager.source_container._up, "c-y",
+                   filter=default_focus)
+        pager.bind(pager.source_container._up, "c-k",
+                   filter=default_focus)
+        pager.bind(pager.source_container._up, "c-p",
+                   filter=default_focus)
+        pager.bind(pager.source_container._up, "up",
+                   filter=default_focus)
+        pager.bind(pager.source_container._firstline,
+                   "g", filter=default_focus, eager=True)
+        pager.bind(pager.source_container._firstline, "<",
+                   filter=default_focus)
+        pager.bind(pager.source_container._firstline,
+                   "escape", "<", filter=default_focus)
+        pager.bind(pager.source_container._lastline, "G",
+                   filter=default_focus)
+        pager.bind(pager.source_container._lastline, ">",
+                   filter=default_focus)
+        pager.bind(pager.source_container._lastline,
+                   "escape", ">", filter=default_focus)
+        pager.bind(pager.source_container._toggle_highlighting,
+                   prompt_toolkit.keys.Keys.Escape, "u")
+
+        pager.bind(pager.source_container._mark, "m", prompt_toolkit.keys.Keys.Any,
+                   filter=default_focus)
+        pager.bind(pager.source_container._goto_mark, "'",
+                   prompt_toolkit.keys.Keys.Any, filter=default_focus)
+        pager.bind(pager.source_container._gotomark_dot, "c-x",
+                   prompt_toolkit.keys.Keys.ControlX, filter=default_focus)
+
+        pager.bind(pager.source_container._follow, "F",
+                   filter=default_focus)
+
+        pager.bind(pager.source_container._cancel_search,
+                   "backspace",
+                   filter=prompt_toolkit.filters.has_focus(
+                       pager.source_container.search_buffer) & pager.source_container.search_buffer_is_empty
+                   )
+
+        pager.bind(pager.source_container._left, "left", filter=focus_no_wrap)
+        pager.bind(pager.source_container._left, "escape",
+                   "(", filter=focus_no_wrap)
+
+        pager.bind(pager.source_container._right, "right", filter=focus_no_wrap)
+        pager.bind(pager.source_container._right, "escape", ")",
+                   filter=focus_no_wrap)
+
+        pager.bind(pager._suspend, "c-z", filter=prompt_toolkit.filters.Condition(
+            prompt_toolkit.utils.suspend_to_background_supported))
+
+        pager.bind(pager.source_container._next_file, "F",
+                   filter=default_focus, eager=True)
+        pager.bind(pager.source_container._previous_file, "B",
+                   filter=default_focus)
+
+        #
+        # ::: colon :::
+        #
+        pager.bind(pager._colon, ":", filter=default_focus)
+        pager.bind(pager.source_container._next_file, "n", filter=pager.has_colon)
+        pager.bind(pager.source_container._previous_file,
+                   "p", filter=pager.has_colon)
+        pager.bind(pager.source_container._remove_source,
+                   "d", filter=pager.has_colon)
+        pager.bind(pager._cancel_colon, "backspace", filter=pager.has_colon)
+        pager.bind(pager._cancel_colon, "q", filter=pager.has_colon, eager=True)
+        pager.bind(pager._any, prompt_toolkit.keys.Keys.Any,
+                   filter=pager.has_colon)
+        pager.bind(pager.source_container._wrap, "w", filter=pager.has_colon)
+
+        #
+        # examine
+        #
+        pager.bind(pager._examine, prompt_toolkit.keys.Keys.ControlX,
+                   prompt_toolkit.keys.Keys.ControlV, filter=default_focus)
+        pager.bind(pager._examine, "e", filter=pager.has_colon)
+        pager.bind(pager.source_container._cancel_examine, "c-c",
+                   filter=examine_focus)
+        pager.bind(pager.source_container._cancel_examine, "c-g",
+                   filter=examine_focus)
 
 
 def run():
@@ -16,7 +16,7 @@ from ..source.sourcecontainer import SourceContainer
 class PagerLayout:
     def __init__(self,
                  open_file,
-                 has_colon: prompt_toolkit.filters.Condition,
+                 has_colon: prompt_toolkit.filters.Filter,
                  waiting: prompt_toolkit.filters.Condition,
                  _get_statusbar_left_tokens, _get_statusbar_right_tokens,
                  source_container: SourceContainer,
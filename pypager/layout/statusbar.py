@@ -9,7 +9,7 @@ from ..source import Source
 
 class StatusBar(prompt_toolkit.layout.containers.ConditionalContainer):
     def __init__(self,
-                 has_colon: prompt_toolkit.filters.Condition,
+                 has_colon: prompt_toolkit.filters.Filter,
                  _get_statusbar_left_tokens,
                  _get_statusbar_right_tokens) -> None:
 
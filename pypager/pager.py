@@ -1,29 +1,24 @@
 """
 Pager implementation in Python.
 """
-from typing import Optional, Union, Callable
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, TextIO, Union, Callable
+import contextlib
+import functools
 import sys
 
 import prompt_toolkit
 from prompt_toolkit.application.current import get_app
 import prompt_toolkit.keys
-import prompt_toolkit.search
 import prompt_toolkit.formatted_text
+import prompt_toolkit.input
 import prompt_toolkit.key_binding
-import prompt_toolkit.widgets.toolbars
-import prompt_toolkit.layout.containers
-import prompt_toolkit.layout.controls
-import prompt_toolkit.layout.processors
-import prompt_toolkit.layout.menus
 import prompt_toolkit.layout
-import prompt_toolkit.buffer
-import prompt_toolkit.completion
-import prompt_toolkit.document
 import prompt_toolkit.enums
-import prompt_toolkit.lexers
 import prompt_toolkit.styles
 import prompt_toolkit.filters
-import prompt_toolkit.utils
+
+if TYPE_CHECKING:
+    import prompt_toolkit.lexers
 
 
 from .help import HELP
@@ -37,6 +32,45 @@ __all__ = [
     "Pager",
 ]
 
+# Parsed key names. The same few names are bound over and over again.
+_parsed_keys: Dict[Union[prompt_toolkit.keys.Keys, str], Union[prompt_toolkit.keys.Keys, str]] = {}
+
+
+def _parse_key(key: Union[prompt_toolkit.keys.Keys, str]) -> Union[prompt_toolkit.keys.Keys, str]:
+    try:
+        return _parsed_keys[key]
+    except KeyError:
+        result = _parsed_keys[key] = prompt_toolkit.key_binding.key_bindings._parse_key(key)
+        return result
+
+
+@functools.lru_cache(maxsize=1)
+def _get_input(stdout: TextIO) -> prompt_toolkit.input.Input:
+    """
+    Input for the given stdout device. Created once and shared by all `Pager`
+    instances. (They should not run at the same time.)
+    """
+    from prompt_toolkit.input.defaults import create_input
+    return create_input(stdout)
+
+
+class _AttrCondition(prompt_toolkit.filters.Filter):
+    """
+    Filter that reads a boolean attribute of an object.
+    (Cheaper than a `Condition` wrapping a lambda.)
+    """
+
+    def __init__(self, obj: object, name: str) -> None:
+        super().__init__()
+        self.obj = obj
+        self.name = name
+
+    def __call__(self) -> bool:
+        return getattr(self.obj, self.name)
+
+    def __repr__(self) -> str:
+        return "_AttrCondition(%r, %r)" % (self.obj, self.name)
+
 
 class Pager:
     """
@@ -48,16 +82,23 @@ class Pager:
         p.run()
     """
 
+    #: Text at the bottom left. (Parsed once, not on every render.)
+    _statusbar_left = prompt_toolkit.formatted_text.HTML(
+        " (press <key>[h]</key> for help or <key>[q]</key> to quit)")
+
     def __init__(self) -> None:
         self.source_container = SourceContainer(self.on_message)
         self._message = ''
 
         self._in_colon_mode = False
-        self.has_colon = prompt_toolkit.filters.Condition(
-            lambda: self._in_colon_mode)
+        self._help_source: Optional[FormattedTextSource] = None
+        self.has_colon = _AttrCondition(self, "_in_colon_mode")
 
         self.key_bindings = prompt_toolkit.key_binding.KeyBindings()
 
+        # Bindings collected inside `batch_bindings`. (None outside of it.)
+        self._pending_bindings: Optional[List[prompt_toolkit.key_binding.key_bindings.Binding]] = None
+
         self.layout = PagerLayout(self.source_container.open_file,
                                   has_colon=self.has_colon,
                                   waiting=prompt_toolkit.filters.Condition(
@@ -72,8 +113,7 @@ class Pager:
         # By default, use the stdout device for input.
         # (This makes it possible to pipe data to stdin, but still read key
         # strokes from the TTY).
-        from prompt_toolkit.input.defaults import create_input
-        input = create_input(sys.stdout)
+        input = _get_input(sys.stdout)
 
         self.application = prompt_toolkit.Application(
             input=input,
@@ -85,13 +125,16 @@ class Pager:
             after_render=self.source_container._after_render,
             full_screen=True,
             editing_mode=prompt_toolkit.enums.EditingMode.VI,
+            # Input that's streaming in invalidates the UI all the time.
+            # Don't redraw more than 50 times per second.
+            min_redraw_interval=0.02,
         )
 
         # Hide message when a key is pressed.
         self.application.key_processor.before_key_press += self.clear_message
 
     @classmethod
-    def from_pipe(cls, lexer: Optional[prompt_toolkit.lexers.Lexer] = None) -> "Pager":
+    def from_pipe(cls, lexer: "Optional[prompt_toolkit.lexers.Lexer]" = None) -> "Pager":
         """
         Create a pager from another process that pipes in our stdin.
         """
@@ -113,9 +156,8 @@ class Pager:
             record_in_macro: prompt_toolkit.filters.FilterOrBool = True):
         assert keys
 
-        keys = tuple(prompt_toolkit.key_binding.key_bindings._parse_key(k)
-                     for k in keys)
-        self.key_bindings.bindings.append(
+        keys = tuple(_parse_key(k) for k in keys)
+        self.bind_many([
             prompt_toolkit.key_binding.key_bindings.Binding(
                 keys,
                 func,
@@ -125,19 +167,56 @@ class Pager:
                 save_before=save_before,
                 record_in_macro=record_in_macro,
             )
-        )
-        self.key_bindings._clear_cache()
+        ])
+
+    def bind_many(self, bindings: Iterable[prompt_toolkit.key_binding.key_bindings.Binding]) -> None:
+        """
+        Register several `Binding` objects at once. The key bindings cache is
+        only cleared once, at the end. (Inside `batch_bindings`, they are
+        registered when the block ends.)
+        """
+        if self._pending_bindings is not None:
+            self._pending_bindings.extend(bindings)
+        else:
+            self.key_bindings.bindings.extend(bindings)
+            self.key_bindings._clear_cache()
+
+    @contextlib.contextmanager
+    def batch_bindings(self) -> Iterator[None]:
+        """
+        Register all bindings made with `bind` or `bind_many` inside this
+        block at once, so that the key bindings cache is only cleared one
+        time.
+        """
+        if self._pending_bindings is not None:
+            # Already batching.
+            yield
+            return
+
+        self._pending_bindings = []
+        try:
+            yield
+        finally:
+            bindings, self._pending_bindings = self._pending_bindings, None
+            self.key_bindings.bindings.extend(bindings)
+            self.key_bindings._clear_cache()
 
     def clear_message(self, e):
-        self._message = ''
+        # Called before every key press; most of the time there is nothing
+        # to clear.
+        if self._message:
+            self._message = ''
 
     def on_message(self, msg: str):
-        self._message = msg
+        # Messages can also come from outside a key press (e.g. when opening
+        # a file failed), so redraw, but only if something changed.
+        if msg != self._message:
+            self._message = msg
+            get_app().invalidate()
 
     def _print_filename(self, event: prompt_toolkit.key_binding.KeyPressEvent) -> None:
         " Print the current file name. "
-        self._message = " {} ".format(
-            self.source_container.current_source.get_name())
+        self._message = f" {self.source_container.current_source.get_name()} "
 
     def _colon(self, event: prompt_toolkit.key_binding.KeyPressEvent) -> None:
         self._in_colon_mode = True
@@ -161,14 +240,21 @@ class Pager:
         """
         Display help text.
         """
-        source = FormattedTextSource(HELP, name="<help>")
-        self.source_container.add_source(source)
+        # Help is already displayed.
+        if self._help_source is not None and \
+                self.source_container.current_source is self._help_source:
+            return
+
+        # (A source can only be read once, so a new one is needed each time
+        # the help is opened.)
+        self._help_source = FormattedTextSource(HELP, name="<help>")
+        self.source_container.add_source(self._help_source)
 
     def _get_statusbar_left_tokens(self) -> prompt_toolkit.formatted_text.HTML:
         """
         Displayed at the bottom left.
         """
-        return prompt_toolkit.formatted_text.HTML(" (press <key>[h]</key> for help or <key>[q]</key> to quit)")
+        return self._statusbar_left
 
     def _quit(self, event: prompt_toolkit.key_binding.KeyPressEvent) -> None:
         " Quit. "
@@ -2,7 +2,6 @@ from typing import Optional, Generator
 from abc import ABCMeta, abstractmethod
 import prompt_toolkit.lexers
 import prompt_toolkit.formatted_text
-import prompt_toolkit.layout.utils
 
 __all__ = [
     "Source",
@@ -77,7 +76,7 @@ class GeneratorSource(Source):
     def read_chunk(self) -> prompt_toolkit.formatted_text.StyleAndTextTuples:
         " Read data from input. Return a list of token/text tuples. "
         try:
-            return prompt_toolkit.layout.utils.explode_text_fragments(next(self.generator))
+            return next(self.generator)
         except StopIteration:
             self._eof = True
             return []
@@ -107,7 +106,7 @@ class StringSource(Source):
             return []
         else:
             self._read = True
-            return prompt_toolkit.layout.utils.explode_text_fragments([("", self.text)])
+            return [("", self.text)]
 
 
 class FormattedTextSource(Source):
@@ -132,4 +131,4 @@ class FormattedTextSource(Source):
             return []
         else:
             self._read = True
-            return prompt_toolkit.layout.utils.explode_text_fragments(self.formatted_text)
+            return self.formatted_text
@@ -1,5 +1,6 @@
-from typing import Optional, Generator, Sequence, Union, Dict
+from typing import Optional, Sequence, Tuple, Union, Dict
 import os
+import re
 from codecs import getincrementaldecoder
 import prompt_toolkit.lexers
 import prompt_toolkit.formatted_text
@@ -21,6 +22,21 @@ for i, (r, g, b) in enumerate(_256_colors_table.colors):
 _fg_colors = {v: k for k, v in FG_ANSI_COLORS.items()}
 _bg_colors = {v: k for k, v in BG_ANSI_COLORS.items()}
 
+# Tokenizer for the pager input: runs of plain text, backspaces, CSI
+# sequences, other escape sequences and (at the end of a chunk) the start of
+# an escape sequence that isn't complete yet.
+_input_re = re.compile(
+    r"(?P<text>[^\x1b\x9b\x08]+)"
+    r"|(?P<backspace>\x08)"
+    r"|(?:\x1b\[|\x9b)(?P<params>[0-9;]*)(?P<final>[^0-9;])"
+    r"|\x1b(?P<escape>[^\[])"
+    r"|(?P<partial>\x1b\[?|\x9b)[0-9;]*\Z",
+    re.DOTALL,
+)
+
+# Maximum number of entries in the style caches of a `PipeSource`.
+_CACHE_SIZE = 1024
+
 
 class PipeSource(Source):
     """
@@ -55,9 +71,16 @@ class PipeSource(Source):
             hidden=False,
         )
 
-        # Start input parser.
-        self._parser = self._parse_corot()
-        next(self._parser)
+        # Parser state.
+        self._pending = ""  # Incomplete escape sequence at the end of a read.
+        self._backspace_style = ""  # Style created by backspace characters.
+        self._style: Optional[str] = None  # Style for the next characters.
+
+        # Caches. (Input tends to use the same few styles over and over.)
+        # Maps (attrs, backspace style) to the style string and
+        # (attrs, SGR parameters) to the resulting attrs.
+        self._styles: Dict[Tuple[prompt_toolkit.styles.Attrs, str], str] = {}
+        self._sgr_results: Dict[Tuple[prompt_toolkit.styles.Attrs, str], prompt_toolkit.styles.Attrs] = {}
 
         # Create incremental decoder for decoding stdin.
         # We can not just do `os.read(stdin.fileno(), 1024).decode('utf-8')`,
@@ -73,7 +96,8 @@ class PipeSource(Source):
         return self._eof
 
     def _get_data(self) -> str:
-        data = os.read(self.fileno, 1024)
+        # (A pipe returns what is available; files are read in large blocks.)
+        data = os.read(self.fileno, 64 * 1024)
 
         # Nothing more to read, stream is closed.
         if data == b"":
@@ -87,84 +111,106 @@ class PipeSource(Source):
         data = self._get_data()
 
         # Send input data to the parser.
-        for c in data:
-            self._parser.send(c)
+        self._parse(data)
 
         # Return the tokens from the parser.
-        # (Don't return the last token yet, because the parser should
-        # be able to pop if the input starts with \b).
-        if self._eof:
-            tokens = self._line_tokens[:]
-            del self._line_tokens[:]
+        # (Don't return the last character yet, because the parser should
+        # be able to pop it if the input starts with \b).
+        line_tokens = self._line_tokens
+
+        if self._eof or not line_tokens:
+            tokens = line_tokens[:]
+            del line_tokens[:]
         else:
-            tokens = self._line_tokens[:-1]
-            del self._line_tokens[:-1]
+            last = line_tokens[-1]
+            style, text = last[0], last[1]
+            tokens = line_tokens[:-1]
+            if len(text) > 1:
+                tokens.append((style, text[:-1]))
+            line_tokens[:] = [(style, text[-1])]
 
         return tokens
 
-    def _parse_corot(self) -> Generator[None, str, None]:
+    def _parse(self, data: str) -> None:
         """
-        Coroutine that parses the pager input.
+        Parse the pager input and append the tokens to `_line_tokens`.
         A \b with any character before should make the next character standout.
         A \b with an underscore before should make the next character emphasized.
         """
-        backspace_style = ""  # Style created by backspace characters.
         line_tokens = self._line_tokens
-        replace_one_token = False
 
-        while True:
-            csi = False
-            c = yield
+        if self._pending:
+            data = self._pending + data
+            self._pending = ""
+
+        for m in _input_re.finditer(data):
+            kind = m.lastgroup
 
-            if c == "\b":
+            if kind == "text":
+                text = m.group("text")
+
+                # Only the first character after a backspace gets the
+                # backspace style.
+                if self._backspace_style:
+                    line_tokens.append((self._get_style(), text[0]))
+                    self._backspace_style = ""
+                    self._style = None
+                    text = text[1:]
+                    if not text:
+                        continue
+
+                line_tokens.append((self._get_style(), text))
+
+            elif kind == "backspace":
                 # Handle \b escape codes from man pages.
                 if line_tokens:
-                    last_char = line_tokens[-1][1]
-                    line_tokens.pop()
-                    replace_one_token = True
+                    last = line_tokens.pop()
+                    style, text = last[0], last[1]
+                    last_char = text[-1]
+                    if len(text) > 1:
+                        line_tokens.append((style, text[:-1]))
+
                     if last_char == "_":
-                        backspace_style = "class:standout2"
-                    else:
-                        backspace_style = "class:standout"
-                continue
-
-            elif c == "\x1b":
-                # Start of color escape sequence.
-                square_bracket = yield
-                if square_bracket == "[":
-                    csi = True
-                else:
-                    continue
-            elif c == "\x9b":
-                csi = True
-
-            if csi:
-                # Got a CSI sequence. Color codes are following.
-                current = ""
-                params = []
-                while True:
-                    char = yield
-                    if char.isdigit():
-                        current += char
+                        self._backspace_style = "class:standout2"
                     else:
-                        params.append(min(int(current or 0), 9999))
-                        if char == ";":
-                            current = ""
-                        elif char == "m":
-                            # Set attributes and token.
-                            self._select_graphic_rendition(
-                                params
-                            )  # TODO: use inline style.
-                            #### token = ('C', ) + self._attrs
-                            break
-                        else:
-                            # Ignore unspported sequence.
-                            break
-            else:
-                line_tokens.append(
-                    (self._get_attrs_style() + " " + backspace_style, c))
-                if replace_one_token:
-                    backspace_style = ""
+                        self._backspace_style = "class:standout"
+                    self._style = None
+
+            elif kind == "final":
+                # Got a CSI sequence. Set attributes when these are color
+                # codes. (Ignore unsupported sequences.)
+                if m.group("final") == "m":
+                    key = (self._attrs, m.group("params"))
+                    try:
+                        self._attrs = self._sgr_results[key]
+                    except KeyError:
+                        self._select_graphic_rendition(
+                            [min(int(p or 0), 9999)
+                             for p in key[1].split(";")]
+                        )  # TODO: use inline style.
+                        if len(self._sgr_results) >= _CACHE_SIZE:
+                            self._sgr_results.clear()
+                        self._sgr_results[key] = self._attrs
+                    self._style = None
+
+            elif kind == "partial":
+                # Escape sequence continues in the next chunk.
+                self._pending = m.group(0)
+
+            # (For "escape", the character after the escape is dropped.)
+
+    def _get_style(self) -> str:
+        " Style for the next characters. (Only computed when it changed.) "
+        if self._style is None:
+            key = (self._attrs, self._backspace_style)
+            try:
+                self._style = self._styles[key]
+            except KeyError:
+                if len(self._styles) >= _CACHE_SIZE:
+                    self._styles.clear()
+                self._style = self._styles[key] = (
+                    self._get_attrs_style() + " " + self._backspace_style)
+        return self._style
 
     def _select_graphic_rendition(self, attrs: Sequence[int]) -> None:
         """
@@ -1,4 +1,5 @@
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+import queue
 import prompt_toolkit.buffer
 import prompt_toolkit.formatted_text
 import prompt_toolkit.filters
@@ -18,35 +19,49 @@ class _EscapeProcessor(prompt_toolkit.layout.processors.Processor):
         self.source_info = source_info
 
     def apply_transformation(self, ti: prompt_toolkit.layout.processors.TransformationInput) -> prompt_toolkit.layout.processors.Transformation:
-        tokens = self.source_info.line_tokens[ti.lineno]
-        return prompt_toolkit.layout.processors.Transformation(tokens[:])
+        line_tokens = self.source_info.line_tokens
+        tokens = line_tokens[ti.lineno]
 
+        # The processors after this one build new lists, so the tokens don't
+        # have to be copied. Only the last line is still appended to while
+        # reading; copy that one.
+        if ti.lineno == len(line_tokens) - 1:
+            tokens = tokens[:]
+        return prompt_toolkit.layout.processors.Transformation(tokens)
 
-def create_buffer_window(source_info: "SourceInfo", highlight_search, search_buffer_control) -> prompt_toolkit.layout.containers.Window:
+
+def create_buffer_window(source_info: "SourceInfo", highlight_search: prompt_toolkit.filters.FilterOrBool, search_buffer_control) -> prompt_toolkit.layout.containers.Window:
     """
     Window for the main content.
     """
     # pager = source_info.pager
 
-    input_processors = [
-        prompt_toolkit.layout.processors.ConditionalProcessor(
-            processor=_EscapeProcessor(source_info),
-            filter=prompt_toolkit.filters.Condition(
-                lambda: not bool(source_info.source.lexer)),
-        ),
+    input_processors: List[prompt_toolkit.layout.processors.Processor] = []
+
+    # The lexer is passed to the `BufferControl` below, so it's fixed for
+    # this window. Without lexer, the tokens from the source are displayed.
+    if not source_info.source.lexer:
+        input_processors.append(_EscapeProcessor(source_info))
+
+    input_processors += [
         prompt_toolkit.layout.processors.TabsProcessor(),
         prompt_toolkit.layout.processors.ConditionalProcessor(
             processor=prompt_toolkit.layout.processors.HighlightSearchProcessor(),
-            filter=prompt_toolkit.filters.Condition(lambda: highlight_search),
+            filter=highlight_search,
         ),
         prompt_toolkit.layout.processors.ConditionalProcessor(
             processor=prompt_toolkit.layout.processors.HighlightIncrementalSearchProcessor(),
-            filter=prompt_toolkit.filters.Condition(lambda: highlight_search),
+            filter=highlight_search,
         ),
         prompt_toolkit.layout.processors.HighlightSelectionProcessor(),
-        prompt_toolkit.layout.processors.HighlightMatchingBracketProcessor(),
     ]
 
+    # Bracket matching is only useful for source code. (It looks for brackets
+    # around the cursor on every render.)
+    if source_info.source.lexer:
+        input_processors.append(
+            prompt_toolkit.layout.processors.HighlightMatchingBracketProcessor())
+
     @prompt_toolkit.filters.Condition
     def wrap_lines() -> bool:
         return source_info.wrap_lines
@@ -72,7 +87,7 @@ class SourceInfo:
 
     _buffer_counter = 0  # Counter to generate unique buffer names.
 
-    def __init__(self, source: Source, highlight_search, search_buffer_control: prompt_toolkit.widgets.toolbars.SearchToolbar) -> None:
+    def __init__(self, source: Source, highlight_search: prompt_toolkit.filters.FilterOrBool, search_buffer_control: prompt_toolkit.widgets.toolbars.SearchToolbar) -> None:
         self.source = source
 
         self.buffer = prompt_toolkit.buffer.Buffer(read_only=True)
@@ -88,6 +103,10 @@ class SourceInfo:
         # source in a coroutine.
         self.waiting_for_input_stream = False
 
+        # Jobs for the thread that reads from this source. (Created by
+        # `SourceContainer` when the first read is needed.)
+        self.read_jobs: "Optional[queue.Queue[Optional[Callable[[], None]]]]" = None
+
         # Enable/disable line wrapping.
         self.wrap_lines = False
 
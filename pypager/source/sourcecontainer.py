@@ -1,6 +1,7 @@
-from typing import Callable, List, Sequence
-import weakref
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import asyncio
+import functools
+import queue
 import threading
 
 import prompt_toolkit
@@ -26,6 +27,9 @@ from .source_info import SourceInfo
 from .pipe_source import FileSource
 from . import Source, DummySource
 
+# Style of the cursor position in the status bar.
+_STATUSBAR_RIGHT_STYLE = "class:statusbar,cursor-position"
+
 
 class SourceContainer(prompt_toolkit.layout.containers.Container):
     def __init__(self, on_message: Callable[[str], None]) -> None:
@@ -37,16 +41,14 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
 
         self._dummy_source = DummySource()
 
-        # Status information for all sources. Source -> SourceInfo.
-        # (Remember this info as long as the Source object exists.)
-        self.source_info: weakref.WeakKeyDictionary[
-            Source, SourceInfo
-        ] = weakref.WeakKeyDictionary()
+        # `SourceInfo` of the current source. This is looked up on every
+        # render and key press, so remember it until the current source
+        # changes.
+        self._current_source_info: Optional[SourceInfo] = None
 
-        # self.current_source_window = current_source_window
-        self._bodies: weakref.WeakKeyDictionary[
-            str, prompt_toolkit.layout.containers.Window
-        ] = weakref.WeakKeyDictionary()  # Map buffer_name to Window.
+        # Status information for all sources. Source -> SourceInfo.
+        # (Entries are removed together with the source from `sources`.)
+        self.source_info: Dict[Source, SourceInfo] = {}
 
         # Search buffer.
         self.search_buffer = prompt_toolkit.buffer.Buffer(multiline=False)
@@ -54,11 +56,21 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
         self.search_toolbar = prompt_toolkit.widgets.toolbars.SearchToolbar(
             vi_mode=True, search_buffer=self.search_buffer
         )
+        self._search_control = self.search_toolbar.control
+
+        # Passed to each `SourceInfo`, so that toggling `highlight_search`
+        # also applies to sources that are already open.
+        self._highlight_search_filter = prompt_toolkit.filters.Condition(
+            lambda: self.highlight_search)
 
         # Returns True when the search buffer is empty.
         self.search_buffer_is_empty = prompt_toolkit.filters.Condition(
             lambda: self.search_buffer.text == "")
 
+        # Last input and output of `_get_statusbar_right_tokens`.
+        self._statusbar_right_key: Optional[Tuple[int, Union[int, str], Optional[int]]] = None
+        self._statusbar_right_tokens: prompt_toolkit.formatted_text.StyleAndTextTuples = []
+
         # When this is True, always make sure that the cursor goes to the
         # bottom of the visible content. This is similar to 'tail -f'.
         self.forward_forever = False
@@ -68,7 +80,7 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
 
         def default_focus() -> bool:
             app = get_app()
-            return app.layout.current_window == self.current_source_info.window
+            return app.layout.current_window is self.current_source_info.window
         self.default_focus = prompt_toolkit.filters.Condition(default_focus)
 
     def history_back(self):
@@ -83,8 +95,9 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
         return self.current_source_info.window
 
     def reset(self) -> None:
-        for body in self._bodies.values():
-            body.reset()
+        # Nothing to reset. (The windows of the sources keep their scroll
+        # position.)
+        pass
 
     def get_render_info(self):
         return self._get_buffer_window().render_info
@@ -115,37 +128,55 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
 
     @property
     def current_source_info(self) -> SourceInfo:
-        try:
-            return self.source_info[self.current_source]
-        except KeyError:
-            return SourceInfo(self.current_source, self.highlight_search, self.search_toolbar.control)
+        source_info = self._current_source_info
+        if source_info is None:
+            source = self.current_source
+            try:
+                source_info = self.source_info[source]
+            except KeyError:
+                # (For the dummy source, when nothing was added yet.) Keep it,
+                # so that state set on it, like marks, isn't lost.
+                source_info = self.source_info[source] = SourceInfo(
+                    source, self._highlight_search_filter, self._search_control)
+            self._current_source_info = source_info
+        return source_info
 
     def open_file(self, filename: str) -> None:
         """
         Open this file.
+        (Finding the lexer can import a Pygments lexer module, so this is
+        done in a thread, not to block rendering.)
         """
-        lexer = prompt_toolkit.lexers.PygmentsLexer.from_filename(
-            filename, sync_from_start=False)
+        async def open_file_async() -> None:
+            lexer = await asyncio.get_event_loop().run_in_executor(
+                None, functools.partial(
+                    prompt_toolkit.lexers.PygmentsLexer.from_filename,
+                    filename, sync_from_start=False))
 
-        try:
-            source = FileSource(filename, lexer=lexer)
-        except IOError as e:
-            self.on_message("{}".format(e))
-        else:
-            self.add_source(source)
+            try:
+                source = FileSource(filename, lexer=lexer)
+            except IOError as e:
+                self.on_message("{}".format(e))
+            else:
+                self.add_source(source)
+
+            get_app().invalidate()
+
+        get_app().create_background_task(open_file_async())
 
     def add_source(self, source: Source) -> SourceInfo:
         """
         Add a new :class:`.Source` instance.
         """
         source_info = SourceInfo(
-            source, self.highlight_search, self.search_toolbar.control)
+            source, self._highlight_search_filter, self._search_control)
         self.source_info[source] = source_info
 
         self.sources.append(source)
 
         # Focus
         self.current_source_index = len(self.sources) - 1
+        self._current_source_info = None
         try:
             get_app().layout.focus(source_info.window)
         except Exception:
@@ -166,6 +197,13 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
 
             # Remove the last source.
             self.sources.remove(current_source)
+            if current_source not in self.sources:
+                source_info = self.source_info.pop(current_source, None)
+
+                # Stop the reader thread.
+                if source_info is not None and source_info.read_jobs is not None:
+                    source_info.read_jobs.put(None)
+            self._current_source_info = None
         else:
             self.on_message("Can't remove the last buffer.")
 
@@ -174,6 +212,7 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
             self.on_message('no prev')
             return
         self.current_source_index -= 1
+        self._current_source_info = None
         get_app().layout.focus(self.current_source_info.window)
         # self._in_colon_mode.set(False)
 
@@ -182,6 +221,7 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
             self.on_message('no next')
             return
         self.current_source_index += 1
+        self._current_source_info = None
         get_app().layout.focus(self.current_source_info.window)
         # self._in_colon_mode.set(False)
 
@@ -193,69 +233,176 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
         # When the bottom is visible, read more input.
         # Try at least `info.window_height`, if this amount of data is
         # available.
-        info = self.get_render_info()
         source = self.current_source
-        source_info = self.source_info[source]
+        source_info = self.current_source_info
+
+        # Nothing to do while reading, or when everything has been read.
+        if source_info.waiting_for_input_stream or source.eof():
+            return
+
+        info = self.get_render_info()
         b = source_info.buffer
         line_tokens = source_info.line_tokens
         loop = asyncio.get_event_loop()
 
-        if not source_info.waiting_for_input_stream and not source.eof() and info:
+        if info:
+            preload = max(info.window_height * 4, 200)
             lines_below_bottom = info.ui_content.line_count - info.last_visible_line()
 
-            # Make sure to preload at least 2x the amount of lines on a page.
-            if lines_below_bottom < info.window_height * 2 or self.forward_forever:
-                # Lines to be loaded.
-                lines = [info.window_height * 2 -
-                         lines_below_bottom]  # nonlocal
-
-                def handle_content(tokens: prompt_toolkit.formatted_text.StyleAndTextTuples) -> List[str]:
-                    """Handle tokens, update `line_tokens`, decrease
-                    line count and return list of characters."""
-                    data = []
-                    for token_char in tokens:
-                        char = token_char[1]
-                        if char == "\n":
-                            line_tokens.append([])
-
-                            # Decrease line count.
-                            lines[0] -= 1
-                        else:
-                            line_tokens[-1].append(token_char)
-                        data.append(char)
-                    return data
-
-                def insert_text(list_of_fragments: Sequence[str]) -> None:
-                    document = prompt_toolkit.document.Document(
-                        b.text + "".join(list_of_fragments), b.cursor_position
-                    )
-                    b.set_document(document, bypass_readonly=True)
-
-                    if self.forward_forever:
-                        b.cursor_position = len(b.text)
+            # Make sure to preload at least 4x the amount of lines on a page.
+            # (Reading more at once amortizes the cost of each read.)
+            if lines_below_bottom < preload or self.forward_forever:
+                # Lines to be loaded. (When following the input, always ask
+                # for at least a page, even if enough lines are preloaded.)
+                lines = [preload - lines_below_bottom]  # nonlocal
+                if self.forward_forever:
+                    lines[0] = max(lines[0], info.window_height, 1)
+
+                def handle_content(tokens: prompt_toolkit.formatted_text.StyleAndTextTuples) -> Tuple[str, List[prompt_toolkit.formatted_text.StyleAndTextTuples]]:
+                    """(in reader thread) Split tokens into lines, decrease
+                    line count and return the text and the lines. The first
+                    line continues the last line of `line_tokens`.
+                    (`line_tokens` itself is only changed in `insert_text`,
+                    together with the buffer.)"""
+                    new_lines: List[prompt_toolkit.formatted_text.StyleAndTextTuples] = [[]]
+
+                    # (Appends to the last line. Rebound when a new line starts.)
+                    append = new_lines[0].append
+
+                    for token in tokens:
+                        # Most tokens don't end a line.
+                        if "\n" not in token[1]:
+                            append(token)
+                            continue
+
+                        style = token[0]
+                        parts = token[1].split("\n")
+                        if parts[0]:
+                            append((style, parts[0]))
+
+                        for part in parts[1:]:
+                            new_lines.append([(style, part)] if part else [])
+                        append = new_lines[-1].append
+
+                        # Decrease line count.
+                        lines[0] -= len(parts) - 1
+
+                    return "".join([token[1] for token in tokens]), new_lines
+
+                # Text and lines from the reader thread that are not yet
+                # inserted, and whether reading is done after it.
+                received: "queue.Queue[Tuple[str, List[prompt_toolkit.formatted_text.StyleAndTextTuples], bool]]" = queue.Queue()
+                insert_scheduled = False
+                inserted = False  # Whether this job inserted any text.
+
+                def hand_over(text: str, new_lines: List[prompt_toolkit.formatted_text.StyleAndTextTuples], done: bool) -> None:
+                    """(in reader thread) Pass text to the event loop. Only
+                    one `insert_text` call is scheduled at a time; it takes
+                    everything that was handed over until it runs."""
+                    nonlocal insert_scheduled
+                    received.put((text, new_lines, done))
+
+                    if not insert_scheduled:
+                        insert_scheduled = True
+                        loop.call_soon_threadsafe(insert_text)
+
+                def insert_text() -> None:
+                    nonlocal insert_scheduled, inserted
+                    insert_scheduled = False
+
+                    fragments: List[str] = []
+                    done_reading = False
+                    while True:
+                        try:
+                            text, new_lines, done = received.get_nowait()
+                        except queue.Empty:
+                            break
+                        if new_lines:
+                            line_tokens[-1].extend(new_lines[0])
+                            line_tokens.extend(new_lines[1:])
+                        fragments.append(text)
+                        done_reading = done_reading or done
+
+                    # Nothing to insert (and no redraw needed) when the
+                    # chunks didn't contain any text.
+                    if any(fragments):
+                        # Join everything at once, so that the existing text
+                        # is copied only a single time.
+                        fragments.insert(0, b.text)
+                        document = prompt_toolkit.document.Document(
+                            "".join(fragments), b.cursor_position
+                        )
+                        b.set_document(document, bypass_readonly=True)
+
+                        if self.forward_forever:
+                            b.cursor_position = len(b.text)
+                        inserted = True
+                    elif not done_reading:
+                        return
+                    elif not inserted and not source.eof():
+                        # This job didn't read anything. Don't redraw; that
+                        # would only start the same job again.
+                        source_info.waiting_for_input_stream = False
+                        return
+
+                    if done_reading:
+                        source_info.waiting_for_input_stream = False
 
                     # Schedule redraw.
                     get_app().invalidate()
 
-                    source_info.waiting_for_input_stream = False
-
                 def receive_content_from_generator() -> None:
-                    " (in executor) Read data from generator. "
+                    " (in reader thread) Read data from generator. "
                     # Call `read_chunk` as long as we need more lines.
+                    # (Hand every chunk over right away; `read_chunk` can
+                    # block for a long time before the next one arrives.)
                     while lines[0] > 0 and not source.eof():
-                        tokens = source.read_chunk()
-                        data = handle_content(tokens)
-                        loop.call_soon(insert_text, data)
+                        text, new_lines = handle_content(source.read_chunk())
+                        hand_over(text, new_lines, False)
+
+                    hand_over("", [], True)
 
                 # Set 'waiting_for_input_stream' and render.
                 source_info.waiting_for_input_stream = True
                 get_app().invalidate()
 
-                # Execute receive_content_from_generator in thread.
-                # (Don't use 'run_in_executor', because we need a daemon.
-                t = threading.Thread(target=receive_content_from_generator)
-                t.daemon = True
-                t.start()
+                # Execute receive_content_from_generator in the reader
+                # thread of this source.
+                self._submit_read_job(source_info, receive_content_from_generator)
+
+    def _submit_read_job(self, source_info: SourceInfo, job: Callable[[], None]) -> None:
+        """
+        Run `job` in the reader thread of this source. The thread is started
+        on first use and reused for all further reads.
+        (Don't use 'run_in_executor', because we need a daemon: reading from
+        a pipe can block until the other end closes it.)
+        """
+        if source_info.read_jobs is None:
+            jobs: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+            t = threading.Thread(target=self._run_read_jobs, args=(source_info, jobs))
+            t.daemon = True
+            t.start()
+            source_info.read_jobs = jobs
+
+        source_info.read_jobs.put(job)
+
+    @staticmethod
+    def _run_read_jobs(source_info: SourceInfo, jobs: "queue.Queue[Optional[Callable[[], None]]]") -> None:
+        """
+        (in reader thread) Run read jobs, one after the other. Stops at the
+        end of the input, or when `None` is put in the queue (the source was
+        removed).
+        """
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            job()
+
+            # Nothing is read anymore. (A new thread is started if needed.)
+            if source_info.source.eof():
+                source_info.read_jobs = None
+                return
 
     def _pagedown(self, event: prompt_toolkit.key_binding.KeyPressEvent) -> None:
         " Page down."
@@ -377,10 +524,12 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
             # have the cursor visible after scrolling. (Otherwise, the Window
             # will scroll back.)
             xpos = w.horizontal_scroll + amount
+            document = b.document
+            lines = document.lines
 
             for line in info.displayed_lines:
-                if len(b.document.lines[line]) >= xpos:
-                    b.cursor_position = b.document.translate_row_col_to_index(
+                if len(lines[line]) >= xpos:
+                    b.cursor_position = document.translate_row_col_to_index(
                         line, xpos
                     )
                     break
@@ -411,19 +560,35 @@ class SourceContainer(prompt_toolkit.layout.containers.Container):
         source_info = self.current_source_info
         buffer = source_info.buffer
         document = buffer.document
-        row = document.cursor_position_row + 1
-        col = document.cursor_position_col + 1
 
+        # (The column is not displayed when wrapping lines.)
+        col: Union[int, str]
         if source_info.wrap_lines:
+            row = document.cursor_position_row + 1
             col = "WRAP"
+        else:
+            # One lookup in the line index for both row and column.
+            row, col = document.translate_index_to_position(
+                document.cursor_position)
+            row += 1
+            col += 1
 
         if self.current_source.eof():
-            percentage = int(100 * row / document.line_count)
-            return [
-                (
-                    "class:statusbar,cursor-position",
-                    " (%s,%s) %s%% " % (row, col, percentage),
-                )
-            ]
+            # `line_tokens` has one entry for each line, the same count as
+            # `document.line_count`, without going through the text.
+            percentage: Optional[int] = 100 * row // len(source_info.line_tokens)
         else:
-            return [("class:statusbar,cursor-position", " (%s,%s) " % (row, col))]
+            percentage = None
+
+        # Most renders don't move the cursor. Reuse the previous tokens then.
+        key = (row, col, percentage)
+        if key != self._statusbar_right_key:
+            if percentage is None:
+                text = f" ({row},{col}) "
+            else:
+                text = f" ({row},{col}) {percentage}% "
+
+            self._statusbar_right_key = key
+            self._statusbar_right_tokens = [(_STATUSBAR_RIGHT_STYLE, text)]
+
+        return self._statusbar_right_tokens